@@ -0,0 +1,70 @@
+"""Benchmark inventory load time and memory per host.
+
+Usage: python benchmarks/bench_inventory.py [HOSTS ...]
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import yaml
+
+from copilot_ansible_agent.inventory.service import InventoryService
+
+GROUPS = ["web", "db", "cache", "edge", "batch"]
+
+
+def write_inventory(path: Path, count: int) -> None:
+    hosts = {}
+    children: dict[str, dict] = {group: {"hosts": {}} for group in GROUPS}
+    for idx in range(count):
+        name = f"host-{idx:06d}"
+        hosts[name] = {
+            "ansible_host": f"10.{idx // 65536 % 256}.{idx // 256 % 256}.{idx % 256}",
+            "ansible_user": "ubuntu",
+            "ansible_become": True,
+        }
+        children[GROUPS[idx % len(GROUPS)]]["hosts"][name] = {}
+    data = {"all": {"hosts": hosts, "children": children}}
+    with path.open("w", encoding="utf-8") as fh:
+        yaml.dump(data, fh, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+
+def bench(count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "inventory.yml"
+        write_inventory(path, count)
+
+        started = time.perf_counter()
+        service = InventoryService(path)
+        elapsed = time.perf_counter() - started
+        del service
+
+        # Traced separately: tracemalloc slows allocation-heavy loading severalfold
+        tracemalloc.start()
+        service = InventoryService(path)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        hosts = list(service.list_hosts())
+        listed = time.perf_counter() - started
+
+    print(
+        f"{count:>8} hosts: load {elapsed:7.2f}s  "
+        f"{current / count:8.0f} B/host retained  list {listed:6.2f}s ({len(hosts)} hosts)"
+    )
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for count in counts:
+        bench(count)
+
+
+if __name__ == "__main__":
+    main()
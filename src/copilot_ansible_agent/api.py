@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import asyncio
-from typing import AsyncIterator, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, Response, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Response, status
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from .config import Settings, get_settings
+from .executor.history import RunStatistics
 from .executor.playbook_runner import PlaybookRun, PlaybookRunner
 from .inventory.models import HostRecord
 from .inventory.service import InventoryService
@@ -39,6 +41,8 @@ class WriteFileRequest(BaseModel):
 class RunPlaybookRequest(BaseModel):
     relative_playbook_path: str = Field(..., description="Path relative to the playbooks directory.")
     extra_args: list[str] | None = None
+    timeout_seconds: float | None = Field(None, gt=0, description="Wall-clock limit for this run.")
+    idle_timeout_seconds: float | None = Field(None, gt=0, description="Limit on time without output.")
 
 
 class RunResponse(BaseModel):
@@ -67,6 +71,12 @@ class InventoryHostResponse(BaseModel):
         )
 
 
+class HostFactsResponse(BaseModel):
+    name: str
+    cached_at: datetime
+    facts: dict[str, Any]
+
+
 class RunStatusResponse(BaseModel):
     run_id: str
     status: str
@@ -85,9 +95,90 @@ class RunStatusResponse(BaseModel):
         )
 
 
+class RunListItem(BaseModel):
+    run_id: str
+    status: str
+    playbook: str
+    return_code: int | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    duration_seconds: float | None = None
+
+    @classmethod
+    def from_run(cls, run: PlaybookRun) -> "RunListItem":
+        return cls(
+            run_id=run.run_id,
+            status=run.status,
+            playbook=run.playbook,
+            return_code=run.return_code,
+            created_at=run.created_at,
+            started_at=run.started_at,
+            finished_at=run.finished_at,
+            duration_seconds=run.duration,
+        )
+
+
+class RunListResponse(BaseModel):
+    runs: list[RunListItem]
+    next_cursor: int | None = None
+
+
+class PlaybookStatsResponse(BaseModel):
+    playbook: str
+    total: int
+    succeeded: int
+    success_rate: float | None = None
+    statuses: dict[str, int] = Field(default_factory=dict)
+    duration_p50: float | None = None
+    duration_p90: float | None = None
+    duration_p99: float | None = None
+
+
+class FailingHostResponse(BaseModel):
+    host: str
+    failures: int
+
+
+class RunStatsResponse(BaseModel):
+    total: int
+    succeeded: int
+    success_rate: float | None = None
+    playbooks: list[PlaybookStatsResponse] = Field(default_factory=list)
+    failing_hosts: list[FailingHostResponse] = Field(default_factory=list)
+
+    @classmethod
+    def from_stats(cls, stats: RunStatistics, *, top_hosts: int) -> "RunStatsResponse":
+        return cls(
+            total=stats.total,
+            succeeded=stats.succeeded,
+            success_rate=stats.success_rate,
+            playbooks=[
+                PlaybookStatsResponse(
+                    playbook=name,
+                    total=entry.total,
+                    succeeded=entry.succeeded,
+                    success_rate=entry.success_rate,
+                    statuses=dict(entry.statuses),
+                    duration_p50=entry.percentile(0.5),
+                    duration_p90=entry.percentile(0.9),
+                    duration_p99=entry.percentile(0.99),
+                )
+                for name, entry in sorted(stats.playbooks.items())
+            ],
+            failing_hosts=[
+                FailingHostResponse(host=host, failures=count)
+                for host, count in stats.top_failing_hosts(top_hosts)
+            ],
+        )
+
+
 async def get_inventory(settings: Settings = Depends(get_settings)) -> InventoryService:
     if not hasattr(app.state, "inventory_service"):
-        app.state.inventory_service = InventoryService(settings.inventory_path)
+        app.state.inventory_service = InventoryService(
+            settings.inventory_path,
+            layout=settings.inventory_layout,
+        )
     return app.state.inventory_service
 
 
@@ -118,19 +209,57 @@ async def list_hosts(inventory: InventoryService = Depends(get_inventory)):
 async def upsert_host(
     payload: HostRequest,
     inventory: InventoryService = Depends(get_inventory),
+    runner: PlaybookRunner = Depends(get_runner),
 ):
     record = inventory.upsert_host(payload.to_record())
+    if runner.fact_cache:
+        # Connection details may have changed; gather facts afresh next run
+        runner.fact_cache.invalidate(record.name)
     return InventoryHostResponse.from_model(record)
 
 
 @app.delete("/inventory/hosts/{name}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
-async def delete_host(name: str, inventory: InventoryService = Depends(get_inventory)):
+async def delete_host(
+    name: str,
+    inventory: InventoryService = Depends(get_inventory),
+    runner: PlaybookRunner = Depends(get_runner),
+):
     deleted = inventory.delete_host(name)
     if not deleted:
         raise HTTPException(status_code=404, detail="Host not found")
+    if runner.fact_cache:
+        runner.fact_cache.invalidate(name)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@app.get("/inventory/hosts/{name}/facts", response_model=HostFactsResponse)
+async def get_host_facts(
+    name: str,
+    inventory: InventoryService = Depends(get_inventory),
+    runner: PlaybookRunner = Depends(get_runner),
+):
+    if not inventory.get_host(name):
+        raise HTTPException(status_code=404, detail="Host not found")
+    cached = runner.fact_cache.get(name) if runner.fact_cache else None
+    if not cached:
+        raise HTTPException(status_code=404, detail="No cached facts for host")
+    cached_at, facts = cached
+    return HostFactsResponse(name=name, cached_at=cached_at, facts=facts)
+
+
+@app.delete("/inventory/hosts/{name}/facts", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
+async def invalidate_host_facts(name: str, runner: PlaybookRunner = Depends(get_runner)):
+    if runner.fact_cache:
+        runner.fact_cache.invalidate(name)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+@app.delete("/inventory/facts", response_model=dict[str, int])
+async def clear_facts(runner: PlaybookRunner = Depends(get_runner)):
+    removed = runner.fact_cache.clear() if runner.fact_cache else 0
+    return {"invalidated": removed}
+
+
 @app.post("/files/write", response_model=dict[str, str])
 async def write_file(
     payload: WriteFileRequest,
@@ -150,10 +279,47 @@ async def run_playbook(
     runner: PlaybookRunner = Depends(get_runner),
 ):
     playbook_path = storage.resolve_path(payload.relative_playbook_path)
-    run = await runner.start_run(playbook_path, extra_args=payload.extra_args)
+    run = await runner.start_run(
+        playbook_path,
+        extra_args=payload.extra_args,
+        timeout_seconds=payload.timeout_seconds,
+        idle_timeout_seconds=payload.idle_timeout_seconds,
+    )
     return RunResponse(run_id=run.run_id, status=run.status)
 
 
+@app.get("/runs", response_model=RunListResponse)
+async def list_runs(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = Query(None, ge=0, description="Value of next_cursor from the previous page."),
+    run_status: Optional[str] = Query(None, alias="status"),
+    playbook: Optional[str] = Query(None, description="Playbook path relative to the playbooks directory."),
+    since: Optional[datetime] = Query(None, description="Only runs created at or after this time."),
+    until: Optional[datetime] = Query(None, description="Only runs created before this time."),
+    runner: PlaybookRunner = Depends(get_runner),
+):
+    page = await runner.page_runs(
+        limit=limit,
+        cursor=cursor,
+        status=run_status,
+        playbook=playbook,
+        since=since,
+        until=until,
+    )
+    return RunListResponse(
+        runs=[RunListItem.from_run(run) for run in page.runs],
+        next_cursor=page.next_cursor,
+    )
+
+
+@app.get("/runs/stats", response_model=RunStatsResponse)
+async def run_stats(
+    top_hosts: int = Query(10, ge=0, le=100),
+    runner: PlaybookRunner = Depends(get_runner),
+):
+    return RunStatsResponse.from_stats(runner.get_stats(), top_hosts=top_hosts)
+
+
 @app.get("/runs/{run_id}", response_model=RunStatusResponse)
 async def get_run(run_id: str, runner: PlaybookRunner = Depends(get_runner)):
     run = await runner.get_run(run_id)
@@ -162,6 +328,16 @@ async def get_run(run_id: str, runner: PlaybookRunner = Depends(get_runner)):
     return RunStatusResponse.from_run(run)
 
 
+@app.post("/runs/{run_id}/cancel", response_model=RunStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def cancel_run(run_id: str, runner: PlaybookRunner = Depends(get_runner)):
+    run = await runner.cancel_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if not run.cancel_requested.is_set():
+        raise HTTPException(status_code=409, detail=f"Run already finished with status {run.status}")
+    return RunStatusResponse.from_run(run)
+
+
 async def _sse_event_stream(generator: AsyncIterator[str]) -> AsyncIterator[bytes]:
     async for chunk in generator:
         yield f"data: {chunk.rstrip()}\n\n".encode("utf-8")
@@ -6,7 +6,7 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-from pydantic import BaseSettings, Field, validator
+from pydantic.v1 import BaseSettings, Field, validator
 
 
 class Settings(BaseSettings):
@@ -24,6 +24,10 @@ class Settings(BaseSettings):
 
     # Inventory
     inventory_filename: str = Field(default="inventory.yml")
+    inventory_layout: str = Field(
+        default="single",
+        description="On-disk layout: 'single' file or 'sharded' into host_vars/ (migrated on startup).",
+    )
 
     # LLM Configuration
     openai_api_key: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
@@ -43,6 +47,23 @@ class Settings(BaseSettings):
 
     # Execution
     ansible_playbook_binary: str = Field(default="ansible-playbook")
+    run_timeout_seconds: Optional[float] = Field(
+        default=None,
+        description="Default wall-clock limit for a playbook run (unlimited when unset).",
+    )
+    run_idle_timeout_seconds: Optional[float] = Field(
+        default=None,
+        description="Default limit on time without any output from a run (unlimited when unset).",
+    )
+    run_kill_grace_seconds: float = Field(
+        default=10.0,
+        description="Time allowed after SIGTERM before the run's process group is sent SIGKILL.",
+    )
+    fact_cache_enabled: bool = Field(default=True, description="Share gathered facts across runs.")
+    fact_cache_timeout: int = Field(
+        default=86400,
+        description="Seconds before cached facts are gathered again (0 never expires).",
+    )
     remote_workspace: Path = Field(
         default=Path("~/copilot-ansible-agent"),
         description="Remote workspace directory on the Ansible master node.",
@@ -53,6 +74,7 @@ class Settings(BaseSettings):
     documents_dir: Path = Field(default=Path("documents"))
     playbooks_dir: Path = Field(default=Path("playbooks"))
     executions_dir: Path = Field(default=Path("executions"))
+    fact_cache_dir: Path = Field(default=Path("facts"), description="Relative to executions_dir unless absolute.")
 
     class Config:
         env_file = ".env"
@@ -70,11 +92,18 @@ class Settings(BaseSettings):
             return candidate
         return project_root / candidate
 
+    @validator("inventory_layout")
+    def _check_inventory_layout(cls, value: str) -> str:
+        if value not in ("single", "sharded"):
+            raise ValueError("inventory_layout must be 'single' or 'sharded'")
+        return value
+
     @validator(
         "inventory_dir",
         "documents_dir",
         "playbooks_dir",
         "executions_dir",
+        "fact_cache_dir",
         pre=True,
     )
     def _ensure_path(cls, value: Path | str) -> Path:
@@ -98,6 +127,10 @@ class Settings(BaseSettings):
     def executions_path(self) -> Path:
         return self.data_dir / self.executions_dir
 
+    @property
+    def fact_cache_path(self) -> Path:
+        return self.executions_path / self.fact_cache_dir
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -109,6 +142,7 @@ def get_settings() -> Settings:
         settings.documents_path,
         settings.playbooks_path,
         settings.executions_path,
+        settings.fact_cache_path,
     ):
         path.mkdir(parents=True, exist_ok=True)
     return settings
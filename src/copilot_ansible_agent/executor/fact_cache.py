@@ -0,0 +1,77 @@
+"""Ansible fact cache shared by every playbook run."""
+
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+
+class FactCache:
+    """Manage a ``jsonfile`` fact cache directory used by ansible-playbook.
+
+    Runs are pointed at the cache with ``gathering = smart`` so hosts whose
+    facts are still fresh skip the setup step entirely.
+    """
+
+    def __init__(self, cache_dir: Path, timeout_seconds: int) -> None:
+        self.cache_dir = cache_dir
+        self.timeout_seconds = timeout_seconds
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def environment(self) -> dict[str, str]:
+        """Cache settings a run must use for the API to see what it gathers."""
+        return {
+            "ANSIBLE_CACHE_PLUGIN": "jsonfile",
+            "ANSIBLE_CACHE_PLUGIN_CONNECTION": str(self.cache_dir),
+            "ANSIBLE_CACHE_PLUGIN_TIMEOUT": str(self.timeout_seconds),
+        }
+
+    def default_environment(self) -> dict[str, str]:
+        """Settings applied unless the caller or service environment sets them."""
+        return {"ANSIBLE_GATHERING": "smart"}
+
+    def get(self, host: str) -> Optional[tuple[datetime, dict[str, Any]]]:
+        """Return ``(cached_at, facts)`` for a host, or None when absent or expired."""
+        path = self._path(host)
+        if path is None:
+            return None
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if self.timeout_seconds and time.time() - mtime > self.timeout_seconds:
+            return None
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                facts = json.load(fh)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Removed or half-written by a concurrent run
+            return None
+        return datetime.fromtimestamp(mtime, timezone.utc), facts
+
+    def invalidate(self, host: str) -> bool:
+        path = self._path(host)
+        if path is None:
+            return False
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.cache_dir.iterdir():
+            if path.is_file():
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def _path(self, host: str) -> Optional[Path]:
+        # The jsonfile plugin stores one file per inventory hostname
+        if "/" in host or "\\" in host or host in {"", ".", ".."}:
+            return None
+        return self.cache_dir / host
@@ -0,0 +1,112 @@
+"""Incrementally maintained aggregates over finished playbook runs."""
+
+from __future__ import annotations
+
+import bisect
+import re
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Iterable
+
+RECAP_LINE = re.compile(r"^(?P<host>\S+)\s*:\s*(?P<counters>(?:\w+=\d+\s*)+)$")
+FAILURE_COUNTERS = ("failed", "unreachable")
+
+
+def parse_recap_hosts(lines: Iterable[str]) -> dict[str, dict[str, int]]:
+    """Extract per-host counters from the PLAY RECAP section of a run log."""
+    hosts: dict[str, dict[str, int]] = {}
+    in_recap = False
+    for line in lines:
+        if "PLAY RECAP" in line:
+            in_recap = True
+            hosts.clear()
+            continue
+        if not in_recap:
+            continue
+        match = RECAP_LINE.match(line.strip())
+        if not match:
+            continue
+        counters: dict[str, int] = {}
+        for pair in match.group("counters").split():
+            key, _, value = pair.partition("=")
+            counters[key] = int(value)
+        hosts[match.group("host")] = counters
+    return hosts
+
+
+@dataclass
+class PlaybookStats:
+    """Counters and a window of recent durations for a single playbook.
+
+    ``recent`` holds the window in arrival order and ``durations`` the same
+    values sorted, so percentiles describe the latest runs without bias.
+    """
+
+    total: int = 0
+    succeeded: int = 0
+    statuses: Counter[str] = field(default_factory=Counter)
+    durations: list[float] = field(default_factory=list)
+    recent: deque[float] = field(default_factory=deque)
+
+    def add_duration(self, duration: float, max_samples: int) -> None:
+        self.recent.append(duration)
+        bisect.insort(self.durations, duration)
+        if len(self.recent) > max_samples:
+            oldest = self.recent.popleft()
+            del self.durations[bisect.bisect_left(self.durations, oldest)]
+
+    @property
+    def success_rate(self) -> float | None:
+        if not self.total:
+            return None
+        return self.succeeded / self.total
+
+    def percentile(self, quantile: float) -> float | None:
+        if not self.durations:
+            return None
+        index = min(len(self.durations) - 1, int(round(quantile * (len(self.durations) - 1))))
+        return self.durations[index]
+
+
+class RunStatistics:
+    """Aggregate run outcomes as they finish so reads never rescan history.
+
+    Percentiles cover each playbook's most recent ``max_samples`` durations,
+    kept sorted so lookups are constant time.
+    """
+
+    def __init__(self, max_samples: int = 10_000) -> None:
+        self.max_samples = max_samples
+        self.total = 0
+        self.succeeded = 0
+        self.playbooks: dict[str, PlaybookStats] = {}
+        self.failing_hosts: Counter[str] = Counter()
+
+    def record(
+        self,
+        playbook: str,
+        status: str,
+        duration: float | None,
+        recap: dict[str, dict[str, int]] | None = None,
+    ) -> None:
+        stats = self.playbooks.setdefault(playbook, PlaybookStats())
+        stats.total += 1
+        stats.statuses[status] += 1
+        self.total += 1
+        if status == "succeeded":
+            stats.succeeded += 1
+            self.succeeded += 1
+        if duration is not None:
+            stats.add_duration(duration, self.max_samples)
+        for host, counters in (recap or {}).items():
+            if any(counters.get(key, 0) for key in FAILURE_COUNTERS):
+                self.failing_hosts[host] += 1
+
+    @property
+    def success_rate(self) -> float | None:
+        if not self.total:
+            return None
+        return self.succeeded / self.total
+
+    def top_failing_hosts(self, limit: int) -> list[tuple[str, int]]:
+        return self.failing_hosts.most_common(limit)
@@ -3,14 +3,26 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import shlex
+import signal
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from ..config import get_settings
+from ..config import Settings, get_settings
+from .fact_cache import FactCache
+from .history import RunStatistics, parse_recap_hosts
+
+ACTIVE_STATUSES = frozenset({"pending", "running"})
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
 
 
 @dataclass
@@ -21,6 +33,8 @@ class PlaybookRun:
     command: list[str]
     inventory_path: Path
     playbook_path: Path
+    playbook: str = ""
+    sequence: int = 0
     status: str = "pending"
     return_code: Optional[int] = None
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
@@ -28,8 +42,12 @@ class PlaybookRun:
     finished_at: Optional[datetime] = None
     summary: Optional[str] = None
     error: Optional[str] = None
+    timeout_seconds: Optional[float] = None
+    idle_timeout_seconds: Optional[float] = None
     logs: list[str] = field(default_factory=list)
     subscribers: list[asyncio.Queue[Optional[str]]] = field(default_factory=list)
+    cancel_requested: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    last_output_at: Optional[float] = field(default=None, repr=False)
 
     def add_log(self, line: str) -> None:
         self.logs.append(line)
@@ -40,14 +58,37 @@ class PlaybookRun:
         for queue in list(self.subscribers):
             queue.put_nowait(None)
 
+    @property
+    def duration(self) -> Optional[float]:
+        if not self.started_at or not self.finished_at:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+
+@dataclass
+class RunPage:
+    """A page of runs ordered newest first, with the cursor for the next page."""
+
+    runs: list[PlaybookRun]
+    next_cursor: Optional[int] = None
+
 
 class PlaybookRunner:
     """Manage asynchronous ansible-playbook executions."""
 
-    def __init__(self) -> None:
-        self._settings = get_settings()
+    def __init__(self, settings: Optional[Settings] = None) -> None:
+        self._settings = settings or get_settings()
         self._runs: Dict[str, PlaybookRun] = {}
+        # Runs in creation order; a run's ``sequence`` is its index here.
+        self._order: List[PlaybookRun] = []
+        self._stats = RunStatistics()
         self._lock = asyncio.Lock()
+        self.fact_cache: Optional[FactCache] = None
+        if self._settings.fact_cache_enabled:
+            self.fact_cache = FactCache(
+                self._settings.fact_cache_path,
+                self._settings.fact_cache_timeout,
+            )
 
     # ------------------------------------------------------------------ public
     async def start_run(
@@ -57,6 +98,8 @@ class PlaybookRunner:
         inventory_path: Optional[Path] = None,
         extra_args: Optional[list[str]] = None,
         env: Optional[dict[str, str]] = None,
+        timeout_seconds: Optional[float] = None,
+        idle_timeout_seconds: Optional[float] = None,
     ) -> PlaybookRun:
         inventory_path = inventory_path or self._settings.inventory_path
         if not playbook_path.exists():
@@ -78,9 +121,14 @@ class PlaybookRunner:
             command=cmd,
             inventory_path=inventory_path,
             playbook_path=playbook_path,
+            playbook=self._playbook_label(playbook_path),
+            timeout_seconds=timeout_seconds or self._settings.run_timeout_seconds,
+            idle_timeout_seconds=idle_timeout_seconds or self._settings.run_idle_timeout_seconds,
         )
 
         async with self._lock:
+            run.sequence = len(self._order)
+            self._order.append(run)
             self._runs[run.run_id] = run
 
         asyncio.create_task(self._execute(run, env=env))
@@ -90,10 +138,58 @@ class PlaybookRunner:
         async with self._lock:
             return self._runs.get(run_id)
 
+    async def cancel_run(self, run_id: str) -> PlaybookRun | None:
+        """Request cancellation of an active run; finished runs are returned unchanged."""
+        run = await self.get_run(run_id)
+        if run and run.status in ACTIVE_STATUSES:
+            run.cancel_requested.set()
+        return run
+
     async def list_runs(self) -> list[PlaybookRun]:
         async with self._lock:
             return list(self._runs.values())
 
+    async def page_runs(
+        self,
+        *,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+        status: Optional[str] = None,
+        playbook: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> RunPage:
+        """Return runs newest first, resuming before ``cursor`` when given.
+
+        Only the runs needed for the page are visited: the walk stops once
+        ``limit`` matches are found or the runs become older than ``since``.
+        """
+        since = _as_utc(since)
+        until = _as_utc(until)
+        async with self._lock:
+            index = len(self._order) if cursor is None else min(cursor, len(self._order))
+            matches: list[PlaybookRun] = []
+            while index > 0 and len(matches) < limit:
+                index -= 1
+                run = self._order[index]
+                if since and run.created_at < since:
+                    index = 0
+                    break
+                if until and run.created_at >= until:
+                    continue
+                if status and run.status != status:
+                    continue
+                if playbook and run.playbook != playbook:
+                    continue
+                matches.append(run)
+            has_older = index > 0 and not (since and self._order[index - 1].created_at < since)
+            next_cursor = index if has_older and len(matches) == limit else None
+            return RunPage(runs=matches, next_cursor=next_cursor)
+
+    def get_stats(self) -> RunStatistics:
+        """Return the live aggregates over finished runs."""
+        return self._stats
+
     async def stream_run(self, run_id: str) -> asyncio.AsyncIterator[str]:
         run = await self.get_run(run_id)
         if not run:
@@ -116,31 +212,118 @@ class PlaybookRunner:
 
     # ----------------------------------------------------------------- private
     async def _execute(self, run: PlaybookRun, *, env: Optional[dict[str, str]]) -> None:
-        run.status = "running"
         run.started_at = datetime.now(timezone.utc)
+        if run.cancel_requested.is_set():
+            self._finish(run, "cancelled", error="Run cancelled before it started")
+            return
+
+        run.status = "running"
         command_display = " ".join(shlex.quote(part) for part in run.command)
         run.add_log(f"$ {command_display}\n")
 
-        process = await asyncio.create_subprocess_exec(
-            *run.command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env=env,
-        )
+        # A dedicated session makes the playbook and all of its forks one
+        # process group, so termination reaches every SSH worker.
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *run.command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self._build_env(env),
+                start_new_session=True,
+            )
+        except OSError as exc:
+            self._finish(run, "failed", error=f"Failed to start {run.command[0]}: {exc}")
+            return
+        run.last_output_at = asyncio.get_running_loop().time()
 
-        await asyncio.gather(
+        drain = asyncio.gather(
             self._drain_stream(process.stdout, run, source="stdout"),
             self._drain_stream(process.stderr, run, source="stderr"),
         )
+        stop_reason = await self._supervise(run, drain)
+        if stop_reason:
+            run.add_log(f"[connector] {stop_reason}; terminating process group {process.pid}\n")
+            await self._terminate(process)
+        await drain
 
         run.return_code = await process.wait()
+        if stop_reason:
+            status = "cancelled" if run.cancel_requested.is_set() else "timed_out"
+            self._finish(run, status, error=stop_reason)
+            return
+        self._finish(run, "succeeded" if run.return_code == 0 else "failed")
+
+    def _finish(self, run: PlaybookRun, status: str, *, error: Optional[str] = None) -> None:
         run.finished_at = datetime.now(timezone.utc)
-        run.status = "succeeded" if run.return_code == 0 else "failed"
+        run.status = status
+        if error:
+            run.error = error
         run.summary = self._build_summary(run)
-        if run.return_code != 0 and not run.error:
+        if run.return_code not in (0, None) and not run.error:
             run.error = f"Process exited with code {run.return_code}"
+        self._stats.record(run.playbook, run.status, run.duration, parse_recap_hosts(run.logs))
         run.complete_streams()
 
+    def _build_env(self, env: Optional[dict[str, str]]) -> Optional[dict[str, str]]:
+        if not self.fact_cache:
+            return env
+        merged = dict(os.environ if env is None else env)
+        for key, value in self.fact_cache.default_environment().items():
+            merged.setdefault(key, value)
+        # Always point runs at the managed cache so the facts endpoints see them
+        merged.update(self.fact_cache.environment())
+        return merged
+
+    async def _supervise(self, run: PlaybookRun, drain: asyncio.Future) -> Optional[str]:
+        """Wait for output to finish; return why the run must stop early, if it must."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        cancel_wait = asyncio.ensure_future(run.cancel_requested.wait())
+        try:
+            while True:
+                deadlines = []
+                if run.timeout_seconds:
+                    deadlines.append(started + run.timeout_seconds)
+                if run.idle_timeout_seconds:
+                    deadlines.append(run.last_output_at + run.idle_timeout_seconds)
+                timeout = max(0.0, min(deadlines) - loop.time()) if deadlines else None
+
+                done, _ = await asyncio.wait(
+                    {drain, cancel_wait},
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if drain in done:
+                    return None
+                if cancel_wait in done:
+                    return "Run cancelled by request"
+
+                now = loop.time()
+                if run.timeout_seconds and now - started >= run.timeout_seconds:
+                    return f"Run exceeded wall-clock timeout of {run.timeout_seconds:g}s"
+                if run.idle_timeout_seconds and now - run.last_output_at >= run.idle_timeout_seconds:
+                    return f"Run produced no output for {run.idle_timeout_seconds:g}s"
+        finally:
+            cancel_wait.cancel()
+
+    async def _terminate(self, process: asyncio.subprocess.Process) -> None:
+        """Send SIGTERM to the run's process group, escalating to SIGKILL after the grace period."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                await asyncio.wait_for(process.wait(), timeout=self._settings.run_kill_grace_seconds)
+            except asyncio.TimeoutError:
+                continue
+            # The leader exited; make sure no forked worker outlives it.
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            return
+
     async def _drain_stream(
         self,
         stream: asyncio.StreamReader,
@@ -153,11 +336,20 @@ class PlaybookRunner:
             if not line:
                 break
             decoded = line.decode("utf-8", errors="replace")
+            run.last_output_at = asyncio.get_running_loop().time()
             run.add_log(decoded)
             if source == "stderr":
                 run.error = decoded.strip()
 
+    def _playbook_label(self, playbook_path: Path) -> str:
+        try:
+            return playbook_path.resolve().relative_to(self._settings.playbooks_path.resolve()).as_posix()
+        except ValueError:
+            return str(playbook_path)
+
     def _build_summary(self, run: PlaybookRun) -> str:
+        if run.status in ("cancelled", "timed_out"):
+            return self._build_partial_summary(run)
         if not run.logs:
             return "Playbook produced no output."
 
@@ -178,3 +370,10 @@ class PlaybookRunner:
             return "Playbook completed successfully."
         return run.error or "Playbook failed with an unknown error."
 
+    def _build_partial_summary(self, run: PlaybookRun) -> str:
+        outcome = "was cancelled" if run.status == "cancelled" else "timed out"
+        tasks = [line.strip() for line in run.logs if line.startswith("TASK [")]
+        if not tasks:
+            return f"Playbook {outcome} before any task started."
+        last_task = tasks[-1].rstrip("* ").strip()
+        return f"Playbook {outcome} after starting {len(tasks)} task(s). Last task: {last_task}"
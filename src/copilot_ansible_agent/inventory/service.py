@@ -1,23 +1,73 @@
-"""Inventory management backed by a YAML file."""
+"""Inventory management backed by YAML files.
+
+Two on-disk layouts are supported:
+
+``single``
+    One ``inventory.yml`` holding every host and its variables.
+``sharded``
+    ``inventory.yml`` only lists hosts and group membership; each host's
+    variables live in ``host_vars/<name>.yml`` next to it, which Ansible
+    reads natively. Changing a host's variables rewrites one small file.
+
+The sharded skeleton and every host_vars file the connector writes start
+with a marker comment. The marker on the skeleton records the layout on
+disk, and the connector only reads, overwrites or deletes host_vars files
+that carry its own marker. Hosts whose name is not a safe file name, or
+whose ``host_vars`` file is maintained by hand, keep their variables
+inline in the skeleton instead.
+"""
 
 from __future__ import annotations
 
+import gc
+import os
 import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 import yaml
 
-from .models import HostRecord, InventorySnapshot
+from .models import HostRecord
+from .store import HostEntry, HostStore
+
+LAYOUTS = ("single", "sharded")
+LAYOUT_MARKER = "# copilot-ansible-agent inventory layout: sharded"
+HOST_VARS_MARKER = "# Managed by copilot-ansible-agent; changes are overwritten."
+
+# libyaml bindings are several times faster on large inventories when present
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Suspend cyclic GC while building large acyclic structures."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
 
 
 class InventoryService:
-    """Thread-safe inventory CRUD operations."""
+    """Thread-safe inventory CRUD operations.
 
-    def __init__(self, inventory_path: Path) -> None:
+    Hosts are held in a compact :class:`HostStore`; pydantic ``HostRecord``
+    models are only built for callers of the public API.
+    """
+
+    def __init__(self, inventory_path: Path, layout: str = "single") -> None:
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown inventory layout: {layout}")
         self.inventory_path = inventory_path
+        self.layout = layout
+        self.host_vars_dir = inventory_path.parent / "host_vars"
         self._lock = threading.RLock()
-        self._snapshot = InventorySnapshot()
+        self._store = HostStore()
+        self._inline_hosts: set[str] = set()
         self.inventory_path.parent.mkdir(parents=True, exist_ok=True)
         self._load()
 
@@ -27,104 +77,225 @@ class InventoryService:
             self._persist()
             return
 
+        disk_layout = self._disk_layout()
+        with _gc_paused():
+            self._store, self._inline_hosts = self._read_store(sharded=disk_layout == "sharded")
+        if disk_layout != self.layout:
+            self.migrate_layout(self.layout)
+
+    def _disk_layout(self) -> str:
         with self.inventory_path.open("r", encoding="utf-8") as fh:
-            data = yaml.safe_load(fh) or {}
+            return "sharded" if fh.readline().rstrip("\n") == LAYOUT_MARKER else "single"
 
-        hosts: dict[str, HostRecord] = {}
-        groups: dict[str, list[str]] = {}
+    def _read_store(self, *, sharded: bool) -> tuple[HostStore, set[str]]:
+        """Read inventory from disk, returning the store and the hosts with inline vars."""
+        data = _read_yaml(self.inventory_path)
 
+        store = HostStore()
+        inline_hosts: set[str] = set()
         all_section = data.get("all", {})
-        raw_hosts = all_section.get("hosts", {})
+        raw_hosts = all_section.get("hosts") or {}
         for name, vars_map in raw_hosts.items():
-            vars_map = vars_map or {}
-            hosts[name] = HostRecord(
-                name=name,
-                hostname=vars_map.get("ansible_host", name),
-                username=vars_map.get("ansible_user"),
-                password=vars_map.get("ansible_password"),
-                port=vars_map.get("ansible_port"),
-                groups=[],
-                variables={
-                    key: value
-                    for key, value in vars_map.items()
-                    if key not in {"ansible_host", "ansible_user", "ansible_password", "ansible_port"}
-                },
-            )
+            vars_map = dict(vars_map or {})
+            if sharded:
+                if vars_map:
+                    inline_hosts.add(name)
+                path = self._host_vars_path(name)
+                managed = _read_managed_yaml(path) if path else None
+                if managed:
+                    vars_map.update(managed)
+            store.put(store.entry_from_vars(name, vars_map))
 
-        raw_groups = all_section.get("children", {})
+        host_groups: dict[str, list[str]] = {}
+        raw_groups = all_section.get("children") or {}
         for group, payload in raw_groups.items():
-            members = list((payload or {}).get("hosts", {}).keys())
-            groups[group] = members
-            for host in members:
-                if host in hosts:
-                    hosts[host].groups.append(group)
-
-        self._snapshot = InventorySnapshot(hosts=hosts, groups=groups)
+            store.groups.setdefault(group, {})
+            for host in (payload or {}).get("hosts") or {}:
+                store.add_member(group, host)
+                if host in store.hosts:
+                    host_groups.setdefault(host, []).append(group)
+        for host, groups in host_groups.items():
+            store.hosts[host].groups = tuple(groups)
+        return store, inline_hosts
 
     def _persist(self) -> None:
-        data = self._snapshot.to_ansible_inventory()
-        with self.inventory_path.open("w", encoding="utf-8") as fh:
-            yaml.safe_dump(data, fh, sort_keys=True)
-
-    def _update_group_membership(self, host: HostRecord) -> None:
-        for group, members in self._snapshot.groups.items():
-            if host.name in members and group not in host.groups:
-                members.remove(host.name)
-        for group in host.groups:
-            members = self._snapshot.groups.setdefault(group, [])
-            if host.name not in members:
-                members.append(host.name)
+        """Rewrite the full inventory in the configured layout."""
+        if self.layout == "single":
+            _write_yaml(self.inventory_path, self._store.to_ansible_inventory())
+            return
+        inline_hosts: set[str] = set()
+        for entry in self._store:
+            path = self._host_vars_target(entry.name)
+            if path is None:
+                inline_hosts.add(entry.name)
+            else:
+                _write_yaml(path, entry.to_ansible_mapping(), header=HOST_VARS_MARKER)
+        self._inline_hosts = inline_hosts
+        self._persist_skeleton()
+
+    def _persist_skeleton(self) -> None:
+        _write_yaml(
+            self.inventory_path,
+            self._store.to_ansible_skeleton(inline=self._inline_hosts),
+            header=LAYOUT_MARKER,
+        )
+
+    def _persist_host(self, entry: HostEntry, *, membership_changed: bool) -> None:
+        """Persist a change to one host, touching as little as the layout allows."""
+        if self.layout == "single":
+            self._persist()
+            return
+        path = self._host_vars_target(entry.name)
+        if path is None:
+            self._inline_hosts.add(entry.name)
+            self._persist_skeleton()
+            return
+        _write_yaml(path, entry.to_ansible_mapping(), header=HOST_VARS_MARKER)
+        if entry.name in self._inline_hosts:
+            self._inline_hosts.discard(entry.name)
+            membership_changed = True
+        if membership_changed:
+            self._persist_skeleton()
+
+    def _host_vars_path(self, name: str) -> Path | None:
+        """Return the host_vars file for ``name``, or None if it is not a safe file name."""
+        if "/" in name or "\\" in name or name in {"", ".", ".."}:
+            return None
+        return self.host_vars_dir / f"{name}.yml"
+
+    def _host_vars_target(self, name: str) -> Path | None:
+        """Return where the connector may write ``name``'s vars, or None to keep them inline."""
+        path = self._host_vars_path(name)
+        if path is None or (path.exists() and not _is_managed(path)):
+            return None
+        return path
+
+    def _remove_host_vars(self, name: str) -> None:
+        path = self._host_vars_path(name)
+        if path is not None and path.exists() and _is_managed(path):
+            path.unlink(missing_ok=True)
+
+    def _remove_managed_host_vars(self) -> None:
+        if not self.host_vars_dir.is_dir():
+            return
+        for path in self.host_vars_dir.glob("*.yml"):
+            if _is_managed(path):
+                path.unlink(missing_ok=True)
 
     # ------------------------------------------------------------------- API
     def list_hosts(self) -> Iterable[HostRecord]:
         with self._lock:
-            return list(self._snapshot.hosts.values())
+            entries = list(self._store)
+        return [entry.to_record() for entry in entries]
 
     def get_host(self, name: str) -> HostRecord | None:
         with self._lock:
-            return self._snapshot.hosts.get(name)
+            entry = self._store.hosts.get(name)
+        return entry.to_record() if entry else None
 
     def upsert_host(self, record: HostRecord) -> HostRecord:
         with self._lock:
-            self._snapshot.hosts[record.name] = record
-            self._update_group_membership(record)
-            self._persist()
-            return record
+            entry = self._store.entry_from_record(record)
+            previous = self._store.put(entry)
+            self._store.set_membership(entry)
+            self._persist_host(
+                entry,
+                membership_changed=previous is None or previous.groups != entry.groups,
+            )
+            return entry.to_record()
 
     def delete_host(self, name: str) -> bool:
         with self._lock:
-            if name not in self._snapshot.hosts:
+            if name not in self._store.hosts:
                 return False
-            del self._snapshot.hosts[name]
-            for members in self._snapshot.groups.values():
-                if name in members:
-                    members.remove(name)
-            self._persist()
+            self._store.pop(name)
+            self._store.remove_member_everywhere(name)
+            if self.layout == "sharded":
+                self._remove_host_vars(name)
+                self._inline_hosts.discard(name)
+                self._persist_skeleton()
+            else:
+                self._persist()
             return True
 
     def rename_host(self, old_name: str, new_name: str) -> HostRecord:
         with self._lock:
-            record = self._snapshot.hosts.pop(old_name)
-            record.name = new_name
-            self._snapshot.hosts[new_name] = record
-            for members in self._snapshot.groups.values():
-                for idx, member in enumerate(list(members)):
-                    if member == old_name:
-                        members[idx] = new_name
-            self._persist()
-            return record
+            entry = self._store.hosts.pop(old_name)
+            entry.name = new_name
+            self._store.put(entry)
+            self._store.rename_member(old_name, new_name)
+            if self.layout == "sharded":
+                self._remove_host_vars(old_name)
+                self._inline_hosts.discard(old_name)
+            self._persist_host(entry, membership_changed=True)
+            return entry.to_record()
 
     def set_groups(self, name: str, groups: list[str]) -> HostRecord:
         with self._lock:
-            record = self._snapshot.hosts[name]
-            record.groups = groups
-            self._update_group_membership(record)
+            entry = self._store.hosts[name]
+            entry.groups = self._store.intern_groups(groups)
+            self._store.set_membership(entry)
+            if self.layout == "sharded":
+                self._persist_skeleton()
+            else:
+                self._persist()
+            return entry.to_record()
+
+    def migrate_layout(self, layout: str) -> None:
+        """Rewrite the inventory in ``layout`` and use it for later writes.
+
+        Only host_vars files written by the connector are removed when
+        moving back to the single-file layout.
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown inventory layout: {layout}")
+        with self._lock:
+            self.layout = layout
             self._persist()
-            return record
+            if layout == "single":
+                # Left in place, these would override the now-inline variables
+                self._remove_managed_host_vars()
+                self._inline_hosts = set()
 
     def reset(self) -> None:
         """Clear inventory (useful for tests)."""
         with self._lock:
-            self._snapshot = InventorySnapshot()
+            self._store = HostStore()
+            self._inline_hosts = set()
             self._persist()
+            self._remove_managed_host_vars()
+
+
+def _read_yaml(path: Path) -> dict:
+    with path.open("r", encoding="utf-8") as fh:
+        return yaml.load(fh, Loader=_Loader) or {}
+
+
+def _read_managed_yaml(path: Path) -> dict | None:
+    """Read a host_vars file only if the connector wrote it."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    if not text.startswith(HOST_VARS_MARKER + "\n"):
+        return None
+    return yaml.load(text, Loader=_Loader) or {}
+
+
+def _is_managed(path: Path) -> bool:
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            return fh.readline().rstrip("\n") == HOST_VARS_MARKER
+    except FileNotFoundError:
+        return False
+
 
+def _write_yaml(path: Path, data: dict, *, header: str | None = None) -> None:
+    """Write via a temporary file so readers never see a partial inventory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        if header:
+            fh.write(header + "\n")
+        yaml.dump(data, fh, Dumper=_Dumper, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,208 @@
+"""Compact in-memory representation of inventory hosts."""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Iterator
+
+from .models import HostRecord
+
+CONNECTION_VARS = frozenset({"ansible_host", "ansible_user", "ansible_password", "ansible_port"})
+
+_EMPTY_VARS: dict[str, Any] = {}
+
+
+def _vars_key(variables: dict[str, Any]) -> frozenset | None:
+    try:
+        # Include the type so e.g. ``True`` and ``1`` do not share a dict
+        return frozenset((name, type(value), value) for name, value in variables.items())
+    except TypeError:
+        # Unhashable values (lists, nested mappings) keep a private dict
+        return None
+
+
+class HostEntry:
+    """Slotted host record; ``groups`` is a tuple of interned names and
+    ``variables`` may be shared between hosts, so neither is mutated in place."""
+
+    __slots__ = ("name", "hostname", "username", "password", "port", "groups", "variables")
+
+    def __init__(
+        self,
+        name: str,
+        hostname: str,
+        username: str | None,
+        password: str | None,
+        port: int | None,
+        groups: tuple[str, ...],
+        variables: dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.port = port
+        self.groups = groups
+        self.variables = variables
+
+    def to_record(self) -> HostRecord:
+        """Materialise a pydantic model; values were validated when first stored."""
+        return HostRecord.model_construct(
+            name=self.name,
+            hostname=self.hostname,
+            username=self.username,
+            password=self.password,
+            port=self.port,
+            groups=list(self.groups),
+            variables=dict(self.variables),
+        )
+
+    def to_ansible_mapping(self) -> dict[str, Any]:
+        mapping: dict[str, Any] = {"ansible_host": self.hostname}
+        if self.username:
+            mapping["ansible_user"] = self.username
+        if self.password:
+            mapping["ansible_password"] = self.password
+        if self.port:
+            mapping["ansible_port"] = self.port
+        mapping.update(self.variables)
+        return mapping
+
+
+class HostStore:
+    """Hosts keyed by name plus group membership kept as insertion-ordered sets.
+
+    Strings that repeat across hosts (group names, usernames) are interned and
+    identical variable mappings share one dict. Shared dicts are reference
+    counted, so add and remove hosts through :meth:`put` and :meth:`pop`.
+    """
+
+    def __init__(self) -> None:
+        self.hosts: dict[str, HostEntry] = {}
+        self.groups: dict[str, dict[str, None]] = {}
+        # key -> [shared dict, number of entries using it]
+        self._shared_vars: dict[frozenset, list] = {}
+
+    def __iter__(self) -> Iterator[HostEntry]:
+        return iter(self.hosts.values())
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    # ------------------------------------------------------------- building
+    def entry_from_vars(self, name: str, vars_map: dict[str, Any]) -> HostEntry:
+        """Build an entry from an Ansible host vars mapping."""
+        username = vars_map.get("ansible_user")
+        return HostEntry(
+            name=name,
+            hostname=vars_map.get("ansible_host", name),
+            username=sys.intern(username) if isinstance(username, str) else username,
+            password=vars_map.get("ansible_password"),
+            port=vars_map.get("ansible_port"),
+            groups=(),
+            variables=self.share_vars(
+                {key: value for key, value in vars_map.items() if key not in CONNECTION_VARS}
+            ),
+        )
+
+    def entry_from_record(self, record: HostRecord) -> HostEntry:
+        return HostEntry(
+            name=record.name,
+            hostname=record.hostname,
+            username=sys.intern(record.username) if record.username else record.username,
+            password=record.password,
+            port=record.port,
+            groups=self.intern_groups(record.groups),
+            variables=self.share_vars(dict(record.variables)),
+        )
+
+    def intern_groups(self, groups: list[str]) -> tuple[str, ...]:
+        return tuple(sys.intern(group) for group in dict.fromkeys(groups))
+
+    def share_vars(self, variables: dict[str, Any]) -> dict[str, Any]:
+        if not variables:
+            return _EMPTY_VARS
+        key = _vars_key(variables)
+        if key is None:
+            return variables
+        slot = self._shared_vars.get(key)
+        if slot is None:
+            slot = self._shared_vars[key] = [variables, 0]
+        slot[1] += 1
+        return slot[0]
+
+    def release_vars(self, variables: dict[str, Any]) -> None:
+        if not variables:
+            return
+        key = _vars_key(variables)
+        slot = self._shared_vars.get(key) if key is not None else None
+        if slot is None or slot[0] is not variables:
+            return
+        slot[1] -= 1
+        if slot[1] <= 0:
+            del self._shared_vars[key]
+
+    def put(self, entry: HostEntry) -> HostEntry | None:
+        """Store an entry built by this store, releasing the one it replaces."""
+        previous = self.hosts.get(entry.name)
+        self.hosts[entry.name] = entry
+        if previous is not None and previous is not entry:
+            self.release_vars(previous.variables)
+        return previous
+
+    def pop(self, name: str) -> HostEntry | None:
+        entry = self.hosts.pop(name, None)
+        if entry is not None:
+            self.release_vars(entry.variables)
+        return entry
+
+    # ----------------------------------------------------------- membership
+    def add_member(self, group: str, name: str) -> None:
+        self.groups.setdefault(sys.intern(group), {})[name] = None
+
+    def set_membership(self, entry: HostEntry) -> None:
+        """Make group membership match ``entry.groups``."""
+        wanted = set(entry.groups)
+        for group, members in self.groups.items():
+            if entry.name in members and group not in wanted:
+                del members[entry.name]
+        for group in entry.groups:
+            self.add_member(group, entry.name)
+
+    def remove_member_everywhere(self, name: str) -> None:
+        for members in self.groups.values():
+            members.pop(name, None)
+
+    def rename_member(self, old_name: str, new_name: str) -> None:
+        for group, members in self.groups.items():
+            if old_name in members:
+                self.groups[group] = {
+                    (new_name if member == old_name else member): None for member in members
+                }
+
+    # ------------------------------------------------------------ rendering
+    def to_ansible_inventory(self) -> dict[str, Any]:
+        return {
+            "all": {
+                "hosts": {entry.name: entry.to_ansible_mapping() for entry in self.hosts.values()},
+                "children": {
+                    group: {"hosts": {member: {} for member in members}}
+                    for group, members in self.groups.items()
+                },
+            }
+        }
+
+    def to_ansible_skeleton(self, inline: set[str] | frozenset[str] = frozenset()) -> dict[str, Any]:
+        """Hosts and group membership; variables live in ``host_vars`` except for ``inline`` hosts."""
+        return {
+            "all": {
+                "hosts": {
+                    name: entry.to_ansible_mapping() if name in inline else {}
+                    for name, entry in self.hosts.items()
+                },
+                "children": {
+                    group: {"hosts": {member: {} for member in members}}
+                    for group, members in self.groups.items()
+                },
+            }
+        }
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+from copilot_ansible_agent.executor.fact_cache import FactCache
+
+
+def test_fact_cache_get_and_invalidate(tmp_path: Path) -> None:
+    cache = FactCache(tmp_path / "facts", timeout_seconds=3600)
+    assert cache.environment()["ANSIBLE_CACHE_PLUGIN_CONNECTION"] == str(tmp_path / "facts")
+    assert cache.get("web01") is None
+
+    (tmp_path / "facts" / "web01").write_text(json.dumps({"ansible_os_family": "Debian"}), encoding="utf-8")
+    cached_at, facts = cache.get("web01")
+    assert facts == {"ansible_os_family": "Debian"}
+    assert cached_at.tzinfo is not None
+
+    assert cache.invalidate("web01") is True
+    assert cache.get("web01") is None
+    assert cache.invalidate("../web01") is False
+
+
+def test_fact_cache_expired_entries_are_ignored(tmp_path: Path) -> None:
+    cache = FactCache(tmp_path, timeout_seconds=60)
+    path = tmp_path / "db01"
+    path.write_text("{}", encoding="utf-8")
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+    assert cache.get("db01") is None
+    assert cache.clear() == 1
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import yaml
+
 from copilot_ansible_agent.inventory.models import HostRecord
 from copilot_ansible_agent.inventory.service import InventoryService
 
@@ -28,3 +30,122 @@ def test_upsert_and_delete_host(tmp_path: Path) -> None:
     assert list(service.list_hosts()) == []
     assert inventory_path.exists()
 
+
+def test_reload_round_trip_and_group_changes(tmp_path: Path) -> None:
+    inventory_path = tmp_path / "inventory.yml"
+    service = InventoryService(inventory_path)
+    for name in ("web01", "web02"):
+        service.upsert_host(
+            HostRecord(name=name, hostname=f"{name}.local", groups=["web"], variables={"tier": "front"})
+        )
+    service.set_groups("web02", ["db"])
+    service.rename_host("web01", "web03")
+
+    reloaded = InventoryService(inventory_path)
+    hosts = {host.name: host for host in reloaded.list_hosts()}
+    assert set(hosts) == {"web02", "web03"}
+    assert hosts["web03"].groups == ["web"]
+    assert hosts["web02"].groups == ["db"]
+    assert hosts["web02"].variables == {"tier": "front"}
+
+    # Returned models are copies; mutating them must not leak into the store
+    hosts["web02"].variables["tier"] = "changed"
+    assert reloaded.get_host("web03").variables == {"tier": "front"}
+
+
+def test_shared_variables_are_released(tmp_path: Path) -> None:
+    service = InventoryService(tmp_path / "inventory.yml")
+    service.upsert_host(HostRecord(name="web01", hostname="a", variables={"tier": "front"}))
+    service.upsert_host(HostRecord(name="web02", hostname="b", variables={"tier": "front"}))
+    shared = service._store._shared_vars
+    assert [count for _, count in shared.values()] == [2]
+
+    service.upsert_host(HostRecord(name="web01", hostname="a", variables={"tier": "back"}))
+    assert sorted(count for _, count in shared.values()) == [1, 1]
+
+    service.rename_host("web01", "web02")
+    assert [dict(variables) for variables, _ in shared.values()] == [{"tier": "back"}]
+    service.delete_host("web02")
+    assert shared == {}
+
+
+def test_sharded_layout_writes_host_vars(tmp_path: Path) -> None:
+    inventory_path = tmp_path / "inventory.yml"
+    service = InventoryService(inventory_path, layout="sharded")
+    service.upsert_host(HostRecord(name="web01", hostname="10.0.0.10", groups=["web"]))
+    service.upsert_host(HostRecord(name="web02", hostname="10.0.0.11", groups=["web"]))
+
+    skeleton = yaml.safe_load(inventory_path.read_text(encoding="utf-8"))
+    assert skeleton["all"]["hosts"] == {"web01": {}, "web02": {}}
+    assert set(skeleton["all"]["children"]["web"]["hosts"]) == {"web01", "web02"}
+
+    skeleton_mtime = inventory_path.stat().st_mtime_ns
+    service.upsert_host(HostRecord(name="web01", hostname="10.0.0.20", groups=["web"]))
+    host_vars = yaml.safe_load((tmp_path / "host_vars" / "web01.yml").read_text(encoding="utf-8"))
+    assert host_vars == {"ansible_host": "10.0.0.20"}
+    assert inventory_path.stat().st_mtime_ns == skeleton_mtime
+
+    service.delete_host("web02")
+    assert not (tmp_path / "host_vars" / "web02.yml").exists()
+    assert InventoryService(inventory_path, layout="sharded").get_host("web01").hostname == "10.0.0.20"
+
+
+def test_layout_migration_round_trip(tmp_path: Path) -> None:
+    inventory_path = tmp_path / "inventory.yml"
+    InventoryService(inventory_path).upsert_host(
+        HostRecord(name="db01", hostname="10.0.0.30", groups=["db"], variables={"ansible_become": True})
+    )
+
+    sharded = InventoryService(inventory_path, layout="sharded")
+    assert (tmp_path / "host_vars" / "db01.yml").exists()
+    assert yaml.safe_load(inventory_path.read_text(encoding="utf-8"))["all"]["hosts"] == {"db01": {}}
+    assert sharded.get_host("db01").variables == {"ansible_become": True}
+
+    single = InventoryService(inventory_path)
+    assert not (tmp_path / "host_vars" / "db01.yml").exists()
+    assert single.get_host("db01").groups == ["db"]
+    assert single.get_host("db01").variables == {"ansible_become": True}
+
+
+def test_single_layout_leaves_hand_written_host_vars_alone(tmp_path: Path) -> None:
+    inventory_path = tmp_path / "inventory.yml"
+    InventoryService(inventory_path).upsert_host(HostRecord(name="web01", hostname="10.0.0.10"))
+    user_file = tmp_path / "host_vars" / "web01.yml"
+    user_file.parent.mkdir()
+    user_file.write_text("vault_secret: s3cr3t\n", encoding="utf-8")
+
+    service = InventoryService(inventory_path)
+    service.upsert_host(HostRecord(name="web02", hostname="10.0.0.11"))
+
+    assert user_file.read_text(encoding="utf-8") == "vault_secret: s3cr3t\n"
+    assert "s3cr3t" not in inventory_path.read_text(encoding="utf-8")
+    assert service.get_host("web01").variables == {}
+
+
+def test_sharded_layout_keeps_unsafe_and_hand_managed_hosts_inline(tmp_path: Path) -> None:
+    inventory_path = tmp_path / "inventory.yml"
+    single = InventoryService(inventory_path)
+    single.upsert_host(HostRecord(name="dc/web02", hostname="10.0.0.12"))
+    single.upsert_host(HostRecord(name="web01", hostname="10.0.0.10"))
+    single.upsert_host(HostRecord(name="web03", hostname="10.0.0.13"))
+    user_file = tmp_path / "host_vars" / "web01.yml"
+    user_file.parent.mkdir()
+    user_file.write_text("vault_secret: s3cr3t\n", encoding="utf-8")
+
+    sharded = InventoryService(inventory_path, layout="sharded")
+    skeleton = yaml.safe_load(inventory_path.read_text(encoding="utf-8"))["all"]["hosts"]
+    assert skeleton["dc/web02"] == {"ansible_host": "10.0.0.12"}
+    assert skeleton["web01"] == {"ansible_host": "10.0.0.10"}
+    assert skeleton["web03"] == {}
+    assert user_file.read_text(encoding="utf-8") == "vault_secret: s3cr3t\n"
+    assert (tmp_path / "host_vars" / "web03.yml").exists()
+
+    sharded.upsert_host(HostRecord(name="web01", hostname="10.0.0.20"))
+    assert user_file.read_text(encoding="utf-8") == "vault_secret: s3cr3t\n"
+    reloaded = InventoryService(inventory_path, layout="sharded")
+    assert reloaded.get_host("web01").hostname == "10.0.0.20"
+    assert reloaded.get_host("dc/web02").hostname == "10.0.0.12"
+
+    InventoryService(inventory_path)
+    assert user_file.exists()
+    assert not (tmp_path / "host_vars" / "web03.yml").exists()
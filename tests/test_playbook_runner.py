@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from copilot_ansible_agent.config import Settings
+from copilot_ansible_agent.executor.playbook_runner import PlaybookRun, PlaybookRunner
+
+# Starts a child that ignores SIGTERM, so only the SIGKILL escalation stops it.
+HANGING_PLAYBOOK = """#!/bin/sh
+echo "TASK [first] ****"
+( trap '' TERM; sleep 300 ) &
+echo $! > "{pid_file}"
+echo "TASK [hang] ****"
+sleep 300
+"""
+
+CHATTY_PLAYBOOK = """#!/bin/sh
+for i in 1 2 3 4 5 6 7 8; do
+  echo "TASK [step $i] ****"
+  sleep 0.1
+done
+"""
+
+
+def _make_runner(tmp_path: Path, script: str) -> tuple[PlaybookRunner, Path]:
+    binary = tmp_path / "fake-ansible-playbook"
+    binary.write_text(script.format(pid_file=tmp_path / "child.pid"), encoding="utf-8")
+    binary.chmod(0o755)
+    settings = Settings(
+        data_dir=tmp_path,
+        ansible_playbook_binary=str(binary),
+        run_kill_grace_seconds=0.3,
+        fact_cache_enabled=False,
+    )
+    settings.inventory_path.parent.mkdir(parents=True, exist_ok=True)
+    settings.inventory_path.write_text("all: {}\n", encoding="utf-8")
+    settings.playbooks_path.mkdir(parents=True, exist_ok=True)
+    playbook = settings.playbooks_path / "site.yml"
+    playbook.write_text("- hosts: all\n", encoding="utf-8")
+    return PlaybookRunner(settings), playbook
+
+
+async def _wait_for(run: PlaybookRun, predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate(run):
+        assert time.monotonic() < deadline, f"run stuck in status {run.status}"
+        await asyncio.sleep(0.02)
+
+
+def _finished(run: PlaybookRun) -> bool:
+    return run.status not in ("pending", "running")
+
+
+def _assert_child_reaped(tmp_path: Path) -> None:
+    pid = int((tmp_path / "child.pid").read_text(encoding="utf-8"))
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline:
+        try:
+            state = Path(f"/proc/{pid}/stat").read_text().split()[2]
+        except FileNotFoundError:
+            return
+        if state == "Z":
+            return
+        time.sleep(0.02)
+    pytest.fail(f"child process {pid} outlived its run")
+
+
+@pytest.mark.asyncio
+async def test_cancel_terminates_process_group(tmp_path: Path) -> None:
+    runner, playbook = _make_runner(tmp_path, HANGING_PLAYBOOK)
+    run = await runner.start_run(playbook)
+    await _wait_for(run, lambda r: any("TASK [hang]" in line for line in r.logs))
+
+    assert await runner.cancel_run(run.run_id) is run
+    await _wait_for(run, _finished)
+
+    assert run.status == "cancelled"
+    assert run.error == "Run cancelled by request"
+    assert run.summary == "Playbook was cancelled after starting 2 task(s). Last task: TASK [hang]"
+    assert runner.get_stats().playbooks["site.yml"].statuses["cancelled"] == 1
+    _assert_child_reaped(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_wall_clock_timeout(tmp_path: Path) -> None:
+    runner, playbook = _make_runner(tmp_path, HANGING_PLAYBOOK)
+    run = await runner.start_run(playbook, timeout_seconds=0.5)
+    await _wait_for(run, _finished)
+
+    assert run.status == "timed_out"
+    assert "wall-clock timeout" in run.error
+    assert run.summary.startswith("Playbook timed out")
+    _assert_child_reaped(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_idle_timeout_only_fires_without_output(tmp_path: Path) -> None:
+    runner, playbook = _make_runner(tmp_path, CHATTY_PLAYBOOK)
+    run = await runner.start_run(playbook, idle_timeout_seconds=0.5)
+    await _wait_for(run, _finished)
+    assert run.status == "succeeded"
+
+    runner, playbook = _make_runner(tmp_path, HANGING_PLAYBOOK)
+    run = await runner.start_run(playbook, idle_timeout_seconds=0.3)
+    await _wait_for(run, _finished)
+    assert run.status == "timed_out"
+    assert "no output" in run.error
+    _assert_child_reaped(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_cancel_finished_run_is_a_no_op(tmp_path: Path) -> None:
+    runner, playbook = _make_runner(tmp_path, CHATTY_PLAYBOOK)
+    run = await runner.start_run(playbook)
+    await _wait_for(run, _finished)
+
+    assert await runner.cancel_run(run.run_id) is run
+    assert not run.cancel_requested.is_set()
+    assert run.status == "succeeded"
+    assert await runner.cancel_run("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_spawn_failure_finishes_run(tmp_path: Path) -> None:
+    runner, playbook = _make_runner(tmp_path, CHATTY_PLAYBOOK)
+    (tmp_path / "fake-ansible-playbook").unlink()
+    run = await runner.start_run(playbook)
+    await _wait_for(run, _finished)
+
+    assert run.status == "failed"
+    assert run.error.startswith("Failed to start")
+    assert run.finished_at is not None
+    assert runner.get_stats().playbooks["site.yml"].statuses["failed"] == 1
+    assert not os.path.exists(tmp_path / "child.pid")
+
+
+def test_build_env_injects_managed_fact_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ANSIBLE_GATHERING", "explicit")
+    monkeypatch.setenv("ANSIBLE_CACHE_PLUGIN", "redis")
+    runner = PlaybookRunner(Settings(data_dir=tmp_path, fact_cache_timeout=600))
+    cache_dir = str(runner.fact_cache.cache_dir)
+
+    env = runner._build_env(None)
+    assert env["ANSIBLE_GATHERING"] == "explicit"
+    assert env["ANSIBLE_CACHE_PLUGIN"] == "jsonfile"
+    assert env["ANSIBLE_CACHE_PLUGIN_CONNECTION"] == cache_dir
+    assert env["ANSIBLE_CACHE_PLUGIN_TIMEOUT"] == "600"
+    assert env["PATH"] == os.environ["PATH"]
+
+    env = runner._build_env({"ANSIBLE_CACHE_PLUGIN_CONNECTION": "/elsewhere"})
+    assert env["ANSIBLE_GATHERING"] == "smart"
+    assert env["ANSIBLE_CACHE_PLUGIN_CONNECTION"] == cache_dir
+    assert "PATH" not in env
+
+    disabled = PlaybookRunner(Settings(data_dir=tmp_path, fact_cache_enabled=False))
+    assert disabled.fact_cache is None
+    assert disabled._build_env(None) is None
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from copilot_ansible_agent.config import Settings
+from copilot_ansible_agent.executor.history import RunStatistics, parse_recap_hosts
+from copilot_ansible_agent.executor.playbook_runner import PlaybookRun, PlaybookRunner
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_parse_recap_hosts() -> None:
+    logs = [
+        "PLAY [all] ****\n",
+        "TASK [ping] ****\n",
+        "PLAY RECAP *********************************************************\n",
+        "web01                      : ok=3    changed=1    unreachable=0    failed=0\n",
+        "db01                       : ok=1    changed=0    unreachable=1    failed=0\n",
+    ]
+    hosts = parse_recap_hosts(logs)
+    assert hosts["web01"]["ok"] == 3
+    assert hosts["db01"]["unreachable"] == 1
+
+
+def test_run_statistics_aggregates_incrementally() -> None:
+    stats = RunStatistics()
+    stats.record("site.yml", "succeeded", 10.0, {"web01": {"ok": 2, "failed": 0}})
+    stats.record("site.yml", "failed", 30.0, {"web01": {"ok": 1, "failed": 1}})
+    stats.record("site.yml", "succeeded", 20.0)
+    stats.record("db.yml", "failed", None, {"db01": {"unreachable": 1}})
+
+    assert stats.total == 4
+    assert stats.success_rate == 0.5
+    site = stats.playbooks["site.yml"]
+    assert site.durations == [10.0, 20.0, 30.0]
+    assert site.percentile(0.5) == 20.0
+    assert site.statuses["failed"] == 1
+    assert stats.playbooks["db.yml"].percentile(0.5) is None
+    assert stats.top_failing_hosts(10) == [("web01", 1), ("db01", 1)]
+
+
+def test_percentiles_track_recent_window_past_the_cap() -> None:
+    stats = RunStatistics(max_samples=1000)
+    rng = random.Random(7)
+    durations = [rng.expovariate(1 / 60) for _ in range(20_000)]
+    for duration in durations:
+        stats.record("site.yml", "succeeded", duration)
+
+    window = sorted(durations[-1000:])
+    site = stats.playbooks["site.yml"]
+    assert site.durations == window
+    assert site.percentile(0.9) == window[round(0.9 * 999)]
+    assert site.percentile(0.99) == window[round(0.99 * 999)]
+    # The tails survive: p99 stays well above the median
+    assert site.percentile(0.99) > 3 * site.percentile(0.5)
+
+
+def _runner_with_history(tmp_path: Path) -> PlaybookRunner:
+    runner = PlaybookRunner(Settings(data_dir=tmp_path))
+    for idx in range(10):
+        run = PlaybookRun(
+            run_id=f"run-{idx}",
+            command=[],
+            inventory_path=tmp_path / "inventory.yml",
+            playbook_path=tmp_path / "site.yml",
+            playbook="site.yml" if idx % 2 else "db.yml",
+            sequence=idx,
+            status="failed" if idx % 3 == 0 else "succeeded",
+            created_at=EPOCH + timedelta(minutes=idx),
+        )
+        runner._order.append(run)
+        runner._runs[run.run_id] = run
+    return runner
+
+
+@pytest.mark.asyncio
+async def test_page_runs_walks_cursor_newest_first(tmp_path: Path) -> None:
+    runner = _runner_with_history(tmp_path)
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        page = await runner.page_runs(limit=4, cursor=cursor)
+        seen.extend(run.run_id for run in page.runs)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == [f"run-{idx}" for idx in range(9, -1, -1)]
+    assert len(page.runs) == 2
+
+
+@pytest.mark.asyncio
+async def test_page_runs_filters(tmp_path: Path) -> None:
+    runner = _runner_with_history(tmp_path)
+
+    page = await runner.page_runs(status="failed")
+    assert [run.run_id for run in page.runs] == ["run-9", "run-6", "run-3", "run-0"]
+    assert page.next_cursor is None
+
+    page = await runner.page_runs(playbook="db.yml", limit=2)
+    assert [run.run_id for run in page.runs] == ["run-8", "run-6"]
+    page = await runner.page_runs(playbook="db.yml", limit=2, cursor=page.next_cursor)
+    assert [run.run_id for run in page.runs] == ["run-4", "run-2"]
+
+    # Naive datetimes are treated as UTC
+    page = await runner.page_runs(
+        since=(EPOCH + timedelta(minutes=3)).replace(tzinfo=None),
+        until=EPOCH + timedelta(minutes=7),
+    )
+    assert [run.run_id for run in page.runs] == ["run-6", "run-5", "run-4", "run-3"]
+    assert page.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_page_runs_since_stops_walking_older_runs(tmp_path: Path) -> None:
+    runner = _runner_with_history(tmp_path)
+
+    page = await runner.page_runs(limit=2, since=EPOCH + timedelta(minutes=8))
+    assert [run.run_id for run in page.runs] == ["run-9", "run-8"]
+    # A full page whose next older run predates ``since`` is the last page
+    assert page.next_cursor is None
+
+    page = await runner.page_runs(limit=1, since=EPOCH + timedelta(minutes=8))
+    assert [run.run_id for run in page.runs] == ["run-9"]
+    assert page.next_cursor == 9
+
+    page = await runner.page_runs(limit=5, since=EPOCH + timedelta(minutes=8), status="failed")
+    assert [run.run_id for run in page.runs] == ["run-9"]
+    assert page.next_cursor is None